@@ -1,9 +1,35 @@
 import ollama # Changed from anthropic
-import os
 import json
+import os
+import stat
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson # Optional: faster serialization of tool results
+
+    def _dumps(obj) -> str:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            # e.g. integers beyond 64 bits, which the stdlib encoder handles
+            return json.dumps(obj)
+except ImportError:
+    from json import dumps as _dumps
+
+try:
+    import fastjsonschema # Optional: validates tool arguments against each tool's input_schema
+except ImportError:
+    fastjsonschema = None
+
+# Files larger than this are truncated by read_file_tool to bound memory and prompt size
+MAX_READ_BYTES = 1 << 18 # 256 KiB
+
+# Number of most recent tool results kept verbatim in the conversation sent to Ollama
+KEEP_TOOL_RESULTS = 6
+
 # ANSI escape codes for colors
 class Colors:
     BLUE = '\033[94m'
@@ -12,52 +38,109 @@ class Colors:
     RED = '\033[91m'
     ENDC = '\033[0m'
 
+# Colored prefixes for the lines printed on every turn, built once instead of per print
+_USER_PROMPT = f"{Colors.BLUE}You{Colors.ENDC}: "
+_ASSIST_PREFIX = f"{Colors.YELLOW}Assistant{Colors.ENDC}: "
+_TC_PREFIX = f"{Colors.GREEN}tool_call{Colors.ENDC}: "
+_TR_PREFIX = f"{Colors.GREEN}tool_result{Colors.ENDC}: "
+_ERR_PREFIX = f"{Colors.RED}Error: "
+
 class ToolDefinition:
     """
     A simple class to hold tool definition details.
     """
-    def __init__(self, name, description, input_schema, function):
+    def __init__(self, name, description, input_schema, function, read_only=False):
         self.name = name
         self.description = description
         self.input_schema = input_schema # This is the JSON schema for parameters
         self.function = function # The actual Python function to call
+        self.read_only = read_only # Safe to run concurrently with other read-only tools
+        # Compiled once into a specialised validator function, or None if fastjsonschema is not installed
+        self._validator = fastjsonschema.compile(input_schema) if fastjsonschema else None
+        self._ollama_dict = None # Built on first use by to_ollama_format
 
     def to_ollama_format(self):
         """Converts the tool definition to the format Ollama API expects."""
-        return {
-            "type": "function",
-            "function": {
-                "name": self.name,
-                "description": self.description,
-                "parameters": self.input_schema, # Directly use the schema here
-            },
-        }
+        # The definition is fixed after construction, so the result is built once and reused
+        if self._ollama_dict is None:
+            self._ollama_dict = {
+                "type": "function",
+                "function": {
+                    "name": self.name,
+                    "description": self.description,
+                    "parameters": self.input_schema, # Directly use the schema here
+                },
+            }
+        return self._ollama_dict
 
 # --- Tool Implementations (No changes needed here for Ollama) ---
 
+def _err(msg: str) -> str:
+    """Builds the JSON error string returned by tools without serializing a dict."""
+    return '{"error": ' + _dumps(msg) + '}'
+
+# Resolved once at import; the agent never changes its working directory.
+_CWD = Path.cwd().resolve()
+
+# Contents returned by read_file_tool, keyed by resolved path -> (mtime_ns, size, content)
+_read_cache = {}
+
+def _safe_resolve(path_str: str, action: str = ""):
+    """
+    Resolves path_str and checks it stays within the current working directory.
+    Returns the resolved Path on success, or a JSON string with an error key on failure.
+    """
+    file_path = Path(path_str).resolve()
+    try:
+        # Compares path components, so '/tmp/foobar' is not accepted under '/tmp/foo'
+        file_path.relative_to(_CWD)
+    except ValueError:
+        return _err(f"Access to path '{path_str}' is not allowed{action}. Only paths within the current working directory are permitted.")
+    return file_path
+
 def read_file_tool(input_data: dict) -> str:
     """
-    Reads the content of a given relative file path.
+    Reads the content of a given relative file path, truncated to MAX_READ_BYTES.
     input_data: A dictionary, e.g., {"path": "file.txt"}
     Returns raw content string on success, or a JSON string with an error key on failure.
     """
     path_str = input_data.get("path")
     if not path_str:
-        return json.dumps({"error": "Path is required."})
+        return _err("Path is required.")
     
     try:
-        file_path = Path(path_str).resolve()
-        if not str(file_path).startswith(str(Path.cwd().resolve())):
-             return json.dumps({"error": f"Access to path '{path_str}' is not allowed. Only paths within the current working directory are permitted."})
+        file_path = _safe_resolve(path_str)
+        if isinstance(file_path, str):
+            return file_path
 
-        if not file_path.is_file():
-            return json.dumps({"error": f"File not found or is not a regular file: {path_str}"})
+        try:
+            st = file_path.stat()
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            return _err(f"File not found or is not a regular file: {path_str}")
+
+        # Files the model re-reads during a session are served from memory until they change on disk
+        cache_key = str(file_path)
+        cached = _read_cache.get(cache_key)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
         
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        # The size is already known from stat, so read the raw bytes in one call and decode once
+        truncated = st.st_size > MAX_READ_BYTES
+        with open(file_path, "rb", buffering=0) as f:
+            data = f.read(MAX_READ_BYTES if truncated else st.st_size)
+        # A cut can land inside a multi-byte character, so only truncated reads tolerate bad bytes
+        content = data.decode("utf-8", errors="replace" if truncated else "strict")
+        if "\r" in content:
+            # Keep the universal-newline behaviour of text mode, which edit_file_tool relies on
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        if truncated:
+            content += f"\n<truncated: file is {st.st_size} bytes>"
+        _read_cache[cache_key] = (st.st_mtime_ns, st.st_size, content)
         return content
     except Exception as e:
-        return json.dumps({"error": f"Error reading file {path_str}: {str(e)}"})
+        return _err(f"Error reading file {path_str}: {str(e)}")
 
 def list_files_tool(input_data: dict) -> str:
     """
@@ -69,43 +152,40 @@ def list_files_tool(input_data: dict) -> str:
     path_str = input_data.get("path", ".")
     
     try:
-        base_path = Path(path_str).resolve()
-        if not str(base_path).startswith(str(Path.cwd().resolve())):
-             return json.dumps({"error": f"Access to path '{path_str}' is not allowed. Only paths within the current working directory are permitted."})
+        base_path = _safe_resolve(path_str)
+        if isinstance(base_path, str):
+            return base_path
 
         if not base_path.exists():
-            return json.dumps({"error": f"Path not found: {path_str}"})
+            return _err(f"Path not found: {path_str}")
 
-        files_and_dirs = []
-        for item in base_path.iterdir():
-            name = item.name
-            if item.is_dir():
-                files_and_dirs.append(name + "/")
-            else:
-                files_and_dirs.append(name)
+        # DirEntry.is_dir() reuses the type info from the directory listing instead of a stat per entry
+        with os.scandir(base_path) as entries:
+            files_and_dirs = [entry.name + "/" if entry.is_dir() else entry.name for entry in entries]
         
-        return json.dumps(files_and_dirs)
+        return _dumps(files_and_dirs)
     except Exception as e:
-        return json.dumps({"error": f"Error listing files in {path_str}: {str(e)}"})
+        return _err(f"Error listing files in {path_str}: {str(e)}")
 
 def _create_new_file(file_path_str: str, content: str) -> str:
     """Helper to create a new file and necessary directories."""
     try:
-        p = Path(file_path_str).resolve()
-        if not str(p).startswith(str(Path.cwd().resolve())):
-             return json.dumps({"error": f"Access to path '{file_path_str}' is not allowed for creation. Only paths within the current working directory are permitted."})
+        p = _safe_resolve(file_path_str, " for creation")
+        if isinstance(p, str):
+            return p
 
+        _read_cache.pop(str(p), None)
         p.parent.mkdir(parents=True, exist_ok=True)
         with open(p, "w", encoding="utf-8") as f:
             f.write(content)
         return f"Successfully created file {file_path_str}" # Success message
     except Exception as e:
-        return json.dumps({"error": f"Failed to create file {file_path_str}: {str(e)}"})
+        return _err(f"Failed to create file {file_path_str}: {str(e)}")
 
 
 def edit_file_tool(input_data: dict) -> str:
     """
-    Edits a text file by replacing 'old_str' with 'new_str' or creates a new file.
+    Edits a text file by replacing the first occurrence of 'old_str' with 'new_str' or creates a new file.
     Returns "OK" or success message on success, or a JSON string with an error key on failure.
     """
     path_str = input_data.get("path")
@@ -113,40 +193,47 @@ def edit_file_tool(input_data: dict) -> str:
     new_str = input_data.get("new_str")
 
     if path_str is None or new_str is None:
-        return json.dumps({"error": "Invalid input: 'path' and 'new_str' are required."})
+        return _err("Invalid input: 'path' and 'new_str' are required.")
     
     if old_str is not None and old_str == new_str:
-        return json.dumps({"error": "Invalid input: 'old_str' and 'new_str' must be different if 'old_str' is provided."})
+        return _err("Invalid input: 'old_str' and 'new_str' must be different if 'old_str' is provided.")
 
-    file_path = Path(path_str).resolve()
-    if not str(file_path).startswith(str(Path.cwd().resolve())):
-        return json.dumps({"error": f"Access to path '{path_str}' is not allowed. Only paths within the current working directory are permitted."})
+    file_path = _safe_resolve(path_str)
+    if isinstance(file_path, str):
+        return file_path
 
+    _read_cache.pop(str(file_path), None)
     try:
         if not file_path.exists():
             if old_str == "" or old_str is None:
                 return _create_new_file(path_str, new_str)
             else:
-                return json.dumps({"error": f"File not found: {path_str}, and 'old_str' was provided, so not creating a new file."})
+                return _err(f"File not found: {path_str}, and 'old_str' was provided, so not creating a new file.")
         
         if not file_path.is_file():
-            return json.dumps({"error": f"Path exists but is not a file: {path_str}"})
+            return _err(f"Path exists but is not a file: {path_str}")
 
-        with open(file_path, "r", encoding="utf-8") as f:
+        # Read and rewrite through a single handle instead of reopening the file for writing
+        with open(file_path, "r+", encoding="utf-8") as f:
             original_content = f.read()
 
-        if old_str not in original_content:
-            return json.dumps({"error": f"'old_str' not found in file {path_str}."})
-        if old_str is None or old_str == "":
-            modified_content = original_content + new_str
-        else:
-            modified_content = original_content.replace(old_str, new_str)
-        with open(file_path, "w", encoding="utf-8") as f:
+            if old_str is None or old_str == "":
+                modified_content = original_content + new_str
+            else:
+                # One scan both checks for old_str and locates it; only the first occurrence is replaced
+                idx = original_content.find(old_str)
+                if idx < 0:
+                    return _err(f"'old_str' not found in file {path_str}.")
+                modified_content = original_content[:idx] + new_str + original_content[idx + len(old_str):]
+            if modified_content == original_content:
+                return "OK" # Nothing changed (e.g. appending an empty string), skip the write
+            f.seek(0)
             f.write(modified_content)
+            f.truncate()
         
         return "OK"
     except Exception as e:
-        return json.dumps({"error": f"Error editing file {path_str}: {str(e)}"})
+        return _err(f"Error editing file {path_str}: {str(e)}")
 
 
 # --- Tool Definitions (Schemas remain the same, functions are the same) ---
@@ -161,6 +248,7 @@ READ_FILE_DEFINITION = ToolDefinition(
         "required": ["path"],
     },
     function=read_file_tool,
+    read_only=True,
 )
 
 LIST_FILES_DEFINITION = ToolDefinition(
@@ -173,11 +261,12 @@ LIST_FILES_DEFINITION = ToolDefinition(
         },
     },
     function=list_files_tool,
+    read_only=True,
 )
 
 EDIT_FILE_DEFINITION = ToolDefinition(
     name="edit_file",
-    description="Make edits to a text file. Replaces 'old_str' with 'new_str' in the given file. 'old_str' and 'new_str' MUST be different from each other. If the file specified with path doesn't exist AND 'old_str' is empty, it will be created with 'new_str' as content. If 'old_str' is provided, it must exist in the file. If 'old_str' is empty and file exists, 'new_str' will be appended to the end of the file." ,
+    description="Make edits to a text file. Replaces the first occurrence of 'old_str' with 'new_str' in the given file. 'old_str' and 'new_str' MUST be different from each other. If the file specified with path doesn't exist AND 'old_str' is empty, it will be created with 'new_str' as content. If 'old_str' is provided, it must exist in the file. If 'old_str' is empty and file exists, 'new_str' will be appended to the end of the file." ,
     input_schema={
         "type": "object",
         "properties": {
@@ -193,23 +282,44 @@ EDIT_FILE_DEFINITION = ToolDefinition(
 
 class Agent:
     def __init__(self, tools=None, model_name="llama3.1"):
-        try:
-            # Check if Ollama server is running and the model is available
-            ollama.list() 
-            # You might want to add a specific check for model_name if ollama.list() doesn't suffice
-            print(f"{Colors.GREEN}Successfully connected to Ollama server.{Colors.ENDC}")
-        except Exception as e:
-            print(f"{Colors.RED}Error connecting to Ollama server: {e}{Colors.ENDC}")
-            print(f"{Colors.RED}Please ensure the Ollama server is running and accessible.{Colors.ENDC}")
-            sys.exit(1)
+        # One client for the whole session keeps its HTTP connection alive across turns
+        self._client = ollama.Client()
+        # Check the Ollama server in the background while the user types the first prompt
+        self._server_error = None
+        self._server_check = threading.Thread(target=self._check_server, daemon=True)
+        self._server_check.start()
             
         self.tools = tools if tools else []
-        self.tool_map = {tool.name: tool for tool in self.tools}
+        # Interned keys let lookups with an identical name object short-circuit on identity
+        self.tool_map = {sys.intern(tool.name): tool for tool in self.tools}
+        self._ollama_tools_spec = [tool.to_ollama_format() for tool in self.tools] or None
         self.model_name = model_name
+        # Tools are I/O bound, so independent calls from one assistant turn run concurrently
+        self._pool = ThreadPoolExecutor(max_workers=8)
         self.system_prompt = self._get_system_prompt()
         print(f"{Colors.BLUE}Using Ollama model: {self.model_name}{Colors.ENDC}")
         print(f"{Colors.BLUE}Make sure '{self.model_name}' is pulled ('ollama pull {self.model_name}') and supports tool calling.{Colors.ENDC}")
 
+    def _check_server(self):
+        try:
+            # Check if Ollama server is running and the model is available
+            self._client.list()
+            # You might want to add a specific check for model_name if self._client.list() doesn't suffice
+        except Exception as e:
+            self._server_error = e
+
+    def _wait_for_server(self):
+        """Waits for the startup server check on first use and exits if it failed."""
+        if self._server_check is None:
+            return
+        self._server_check.join()
+        self._server_check = None
+        if self._server_error is not None:
+            print(f"{Colors.RED}Error connecting to Ollama server: {self._server_error}{Colors.ENDC}")
+            print(f"{Colors.RED}Please ensure the Ollama server is running and accessible.{Colors.ENDC}")
+            sys.exit(1)
+        print(f"{Colors.GREEN}Successfully connected to Ollama server.{Colors.ENDC}")
+
     def _get_system_prompt(self):
         # Construct tool descriptions for the initial prompt
         tool_descriptions_list = []
@@ -243,53 +353,87 @@ Think before you answer, and remember to use the tools you have available if nec
 
     def get_user_message(self):
         try:
-            return input(f"{Colors.BLUE}You{Colors.ENDC}: ")
+            return input(_USER_PROMPT)
         except EOFError:
             return None
         except KeyboardInterrupt:
             return None
 
     def run_inference(self, conversation_history):
-        """Sends the conversation to Ollama and gets a response."""
-        ollama_tools_spec = [tool.to_ollama_format() for tool in self.tools]
-        
-        try:
-            # Using the module-level ollama.chat function as per the example
-            response = ollama.chat(
-                model=self.model_name,
-                messages=conversation_history,
-                tools=ollama_tools_spec if ollama_tools_spec else None,
-                # stream=False # Default is False, which is what we want here
-            )
-            return response
-        except Exception as e: # Catching generic Exception, ollama might have specific API errors
-            print(f"{Colors.RED}Ollama API Error: {e}{Colors.ENDC}")
-            return None
+        """
+        Sends the conversation to Ollama and yields response chunks as they are generated.
+        API errors propagate to the caller, which may already have printed part of the turn.
+        """
+        self._wait_for_server()
+        yield from self._client.chat(
+            model=self.model_name,
+            messages=conversation_history,
+            tools=self._ollama_tools_spec,
+            stream=True, # Print text as it arrives instead of waiting for the full turn
+        )
 
     def execute_tool(self, tool_name: str, tool_input: dict) -> str:
         """
         Executes a tool and returns its string result (success message or JSON error string).
         """
-        if tool_name not in self.tool_map:
+        tool_to_execute = self.tool_map.get(tool_name)
+        if tool_to_execute is None:
             error_msg = f"Tool '{tool_name}' not found by agent."
-            print(f"{Colors.RED}Error: {error_msg}{Colors.ENDC}")
-            return json.dumps({"error": error_msg})
+            print(_ERR_PREFIX + error_msg + Colors.ENDC)
+            return _err(error_msg)
+
+        if tool_to_execute._validator is not None:
+            try:
+                tool_to_execute._validator(tool_input)
+            except fastjsonschema.JsonSchemaValueException as e:
+                error_msg = f"Invalid arguments for tool {tool_name}: {e.message}"
+                print(_ERR_PREFIX + error_msg + Colors.ENDC)
+                return _err(error_msg)
 
-        tool_to_execute = self.tool_map[tool_name]
         try:
             result_string = tool_to_execute.function(tool_input)
             return result_string
         except Exception as e:
             # This catch is a fallback if the tool function itself raises an unexpected error
             error_msg = f"Agent failed to execute tool {tool_name}: {str(e)}"
-            print(f"{Colors.RED}Error executing tool {tool_name}: {e}{Colors.ENDC}")
-            return json.dumps({"error": error_msg})
+            print(_ERR_PREFIX + "executing tool " + tool_name + ": " + str(e) + Colors.ENDC)
+            return _err(error_msg)
+
+    def _write_lines(self, lines):
+        """Writes buffered log lines to stdout in a single call and clears the buffer."""
+        if lines:
+            sys.stdout.write("".join(lines))
+            sys.stdout.flush()
+            lines.clear()
+
+    def _compact(self, conversation):
+        """
+        Replaces the content of all but the last KEEP_TOOL_RESULTS tool messages with a short
+        placeholder, so the prompt re-sent on every turn does not grow with old file contents.
+        """
+        kept = 0
+        for message in reversed(conversation):
+            if message.get("role") != "tool":
+                continue
+            if kept < KEEP_TOOL_RESULTS:
+                kept += 1
+                continue
+            content = message.get("content") or ""
+            if content.startswith("<elided "):
+                break # Everything older was compacted on a previous turn
+            message["content"] = f"<elided {len(content.encode('utf-8'))} bytes>"
 
     def run(self):
         """Main loop for the agent."""
         conversation = [{"role": "system", "content": self.system_prompt}]
         print(f"Chat with Ollama (model: {self.model_name}). Use 'ctrl-c' or 'ctrl-d' to quit.")
 
+        # Bound once so the loop below does not re-resolve these attributes on every turn
+        tool_map = self.tool_map
+        execute = self.execute_tool
+        append = conversation.append
+        extend = conversation.extend
+
         needs_user_input = True
         while True:
             if needs_user_input:
@@ -299,29 +443,62 @@ Think before you answer, and remember to use the tools you have available if nec
                     break
                 if not user_input.strip():
                     continue
-                conversation.append({"role": "user", "content": user_input})
+                append({"role": "user", "content": user_input})
             
-            ollama_response = self.run_inference(conversation)
-            if ollama_response is None: # API error likely
+            # Print text as it streams in and merge the chunks into a single assistant message
+            assistant_text_parts = []
+            raw_tool_calls = []
+            response_done = False
+            text_printed = False
+            try:
+                for chunk in self.run_inference(conversation):
+                    chunk_message = chunk['message']
+                    chunk_text = chunk_message.get('content')
+                    if chunk_text:
+                        assistant_text_parts.append(chunk_text) # History keeps the raw text
+                        if not text_printed:
+                            chunk_text = chunk_text.lstrip() # Skip leading whitespace in the printed text only
+                            if chunk_text:
+                                print(_ASSIST_PREFIX, end="")
+                                text_printed = True
+                        if chunk_text:
+                            print(chunk_text, end="", flush=True)
+                    if chunk_message.get('tool_calls'):
+                        raw_tool_calls.extend(chunk_message['tool_calls'])
+                    response_done = chunk.get('done', False)
+            except Exception as e: # Catching generic Exception, ollama might have specific API errors
+                if text_printed:
+                    print() # End the partial assistant line before reporting the error
+                    text_printed = False
+                print(Colors.RED + "Ollama API Error: " + str(e) + Colors.ENDC)
+
+            if text_printed:
+                print()
+
+            if not response_done: # API error likely
                 needs_user_input = True 
                 continue
 
             # The assistant's message, potentially including tool_calls
-            assistant_turn_message = ollama_response['message']
-            conversation.append(assistant_turn_message) # Add assistant's turn to history
-
-            # Extract text content and tool calls from assistant's message
-            assistant_text_content = assistant_turn_message.get('content')
-            raw_tool_calls = assistant_turn_message.get('tool_calls') # This will be a list or None
-
-            if assistant_text_content:
-                print(f"{Colors.YELLOW}Assistant{Colors.ENDC}: {assistant_text_content.strip()}")
+            assistant_turn_message = {"role": "assistant", "content": "".join(assistant_text_parts)}
+            if raw_tool_calls:
+                assistant_turn_message["tool_calls"] = raw_tool_calls
+            append(assistant_turn_message) # Add assistant's turn to history
 
             if raw_tool_calls:
                 needs_user_input = False # Process tools, then let Ollama respond
                 
-                tool_result_messages_for_ollama = []
-                for tool_call_request in raw_tool_calls:
+                # Only batches made entirely of read-only tools are run concurrently, so
+                # edits to the same file are still applied in the order the model asked for
+                run_in_parallel = len(raw_tool_calls) > 1 and all(
+                    getattr(tool_map.get(tool_call_request['function']['name']), "read_only", False)
+                    for tool_call_request in raw_tool_calls
+                )
+
+                tool_result_messages_for_ollama = [None] * len(raw_tool_calls)
+                parallel_calls = [] # (index, tool_name, tool_input) submitted once the batch is logged
+                tool_log_lines = [] # Flushed before anything that may print an error, so the log stays in order
+                for i, tool_call_request in enumerate(raw_tool_calls):
                     tool_name = tool_call_request['function']['name']
                     
                     # Arguments from Ollama are expected to be a dictionary directly
@@ -331,32 +508,51 @@ Think before you answer, and remember to use the tools you have available if nec
                     if not isinstance(tool_arguments, dict):
                         error_message = f"Tool arguments for '{tool_name}' are not in the expected dictionary format."
                         detailed_error_info = f"Received arguments: {tool_arguments}, type: {type(tool_arguments)}"
-                        print(f"{Colors.RED}{error_message} {detailed_error_info}{Colors.ENDC}")
+                        self._write_lines(tool_log_lines)
+                        print(Colors.RED + error_message + " " + detailed_error_info + Colors.ENDC)
                         
-                        tool_result_messages_for_ollama.append({
+                        tool_result_messages_for_ollama[i] = {
                             "role": "tool",
                             "content": json.dumps({
                                 "error": error_message,
                                 "received_arguments": str(tool_arguments) # Convert to string for JSON
                             })
-                        })
+                        }
                         continue # Skip to next tool call if any
 
                     tool_input_data = tool_arguments # Use the dictionary directly
 
-                    print(f"{Colors.GREEN}tool_call{Colors.ENDC}: {tool_name}({json.dumps(tool_input_data)})") # For logging, json.dumps is fine
+                    tool_log_lines.append(_TC_PREFIX + tool_name + "(" + json.dumps(tool_input_data) + ")\n") # Model-supplied values, so keep stdlib json (NaN, big ints)
                     
+                    if run_in_parallel:
+                        parallel_calls.append((i, tool_name, tool_input_data))
+                        continue
+
                     # Execute the tool
-                    result_string_content = self.execute_tool(tool_name, tool_input_data)
-                    print(f"{Colors.GREEN}tool_result{Colors.ENDC}: {result_string_content}")
+                    self._write_lines(tool_log_lines)
+                    result_string_content = execute(tool_name, tool_input_data)
+                    tool_log_lines.append(_TR_PREFIX + result_string_content + "\n")
                     
                     # Prepare tool result message for Ollama
-                    tool_result_messages_for_ollama.append({
+                    tool_result_messages_for_ollama[i] = {
                         "role": "tool",
                         "content": result_string_content 
-                    })
+                    }
+
+                if parallel_calls:
+                    self._write_lines(tool_log_lines)
+                    pending_results = [(i, self._pool.submit(execute, tool_name, tool_input_data))
+                                       for i, tool_name, tool_input_data in parallel_calls]
+                    # Collect concurrent results in the original call order
+                    for i, future in pending_results:
+                        result_string_content = future.result()
+                        tool_log_lines.append(_TR_PREFIX + result_string_content + "\n")
+                        tool_result_messages_for_ollama[i] = {"role": "tool", "content": result_string_content}
+
+                self._write_lines(tool_log_lines)
                 
-                conversation.extend(tool_result_messages_for_ollama) # Add all tool results to conversation
+                extend(tool_result_messages_for_ollama) # Add all tool results to conversation
+                self._compact(conversation)
             
             else: # No tool calls from assistant
                 needs_user_input = True